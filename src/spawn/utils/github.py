@@ -4,29 +4,306 @@ GitHub repository operations for SPAwn.
 This module provides functionality for creating and managing GitHub repositories.
 """
 
+import base64
+import functools
+import hashlib
 import json
 import logging
 import os
+import posixpath
 import subprocess
-import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
-
-import requests
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple, Union
+from urllib.parse import quote
 
 from spawn.config import config
 
 logger = logging.getLogger(__name__)
 
+# REST endpoint templates, relative to the API URL
+_REPO = "/repos/{owner}/{repo}"
+_FORKS = _REPO + "/forks"
+_CONTENTS = _REPO + "/contents/{path}"
+_PAGES = _REPO + "/pages"
+_ACTIONS = _REPO + "/actions/permissions"
+
+# Seconds before a GitHub API request gives up, on either HTTP backend
+_REQUEST_TIMEOUT = 30.0
+
+
+def _endpoint(api_url: str, template: str, owner: str, repo: str, path: str = "") -> str:
+    """
+    Build a GitHub REST API URL.
+
+    Owner and repository names are percent-encoded so unusual names cannot
+    change the endpoint; slashes in ``path`` are kept as path separators.
+
+    Args:
+        api_url: GitHub API URL.
+        template: Endpoint template, e.g. ``_CONTENTS``.
+        owner: Owner of the repository.
+        repo: Name of the repository.
+        path: Path to a file in the repository, for ``_CONTENTS``.
+
+    Returns:
+        Full URL of the endpoint.
+    """
+    return api_url + template.format(
+        owner=quote(owner, safe=""),
+        repo=quote(repo, safe=""),
+        path=quote(path, safe="/"),
+    )
+
+
+def _content_bytes(content: Union[str, Dict[str, Any], bytes]) -> bytes:
+    """
+    Get the bytes of file content to push.
+
+    Args:
+        content: Content of the file. Can be a string, dictionary, or bytes.
+
+    Returns:
+        Content as bytes.
+    """
+    # Dictionaries are serialized compactly to keep the upload small
+    if isinstance(content, dict):
+        return json.dumps(content, separators=(",", ":")).encode("utf-8")
+    
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    
+    return content
+
+
+def _git_blob_sha(raw: bytes) -> str:
+    """
+    Compute the git blob SHA of file content.
+
+    This is the SHA the GitHub contents API reports for a file, so comparing
+    it tells whether the file already holds this content.
+
+    Args:
+        raw: Content of the file.
+
+    Returns:
+        Hex digest of the blob.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+
+
+def _listing_sha(listing: Any, file_path: str) -> Optional[str]:
+    """
+    Find the SHA of a file in a contents API directory listing.
+
+    Listing entries carry each file's SHA but not its content, so this avoids
+    downloading the file only to learn its SHA. GitHub lists at most 1,000
+    entries per directory.
+
+    Args:
+        listing: Decoded response of the file's parent directory.
+        file_path: Path to the file in the repository.
+
+    Returns:
+        SHA of the file, or None if the directory does not contain it.
+    """
+    name = posixpath.basename(file_path.strip("/"))
+    if isinstance(listing, list):
+        for entry in listing:
+            if entry.get("name") == name and entry.get("type") == "file":
+                return entry.get("sha")
+    return None
+
+
+def _clone_command(
+    repo_url: str,
+    target_dir: Path,
+    branch: str,
+    depth: Optional[int] = 1,
+) -> List[str]:
+    """
+    Build the git command used to clone a repository.
+
+    Args:
+        repo_url: URL of the repository to clone.
+        target_dir: Directory to clone the repository into.
+        branch: Branch to clone.
+        depth: Number of commits of history to fetch from ``branch`` alone. If None,
+            clones the full history of all branches and tags.
+
+    Returns:
+        Command line for ``subprocess``.
+    """
+    cmd = ["git", "clone", "--branch", branch]
+    
+    if depth is not None:
+        # Shallow, blobless clone of one branch: only what is needed to check
+        # out the tip
+        cmd += ["--single-branch", "--no-tags", f"--depth={depth}", "--filter=blob:none"]
+    
+    return cmd + [repo_url, str(target_dir)]
+
+
+def _git_env(token: Optional[str] = None) -> Dict[str, str]:
+    """
+    Get the environment for git subprocesses.
+
+    The token is passed to git as an ``http.extraHeader`` through the
+    ``GIT_CONFIG_*`` variables (git 2.31+), so it never appears in the clone
+    URL, the cloned repository's ``.git/config``, or the process arguments.
+    Basic auth with the ``x-access-token`` user works for classic and
+    fine-grained personal access tokens alike.
+
+    Args:
+        token: GitHub token to authenticate with. If None, git runs unauthenticated.
+
+    Returns:
+        Copy of the current environment with interactive prompts disabled.
+    """
+    # Fail fast instead of hanging on a credential prompt when the token is bad
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    
+    if token:
+        credentials = base64.b64encode(f"x-access-token:{token}".encode("utf-8")).decode("ascii")
+        index = int(env.get("GIT_CONFIG_COUNT", "0"))
+        env[f"GIT_CONFIG_KEY_{index}"] = "http.https://github.com/.extraHeader"
+        env[f"GIT_CONFIG_VALUE_{index}"] = f"Authorization: Basic {credentials}"
+        env["GIT_CONFIG_COUNT"] = str(index + 1)
+    
+    return env
+
+
+def _run_clone(cmd: List[str], env: Dict[str, str], tail_lines: int = 40) -> None:
+    """
+    Run a git clone command, streaming its output to the log.
+
+    Only the last ``tail_lines`` lines of output are kept, for the error message.
+
+    Args:
+        cmd: Command line to run.
+        env: Environment for the git process.
+        tail_lines: Number of output lines to keep for error reporting.
+
+    Raises:
+        ValueError: If git exits with an error.
+    """
+    tail: deque = deque(maxlen=tail_lines)
+    
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        env=env,
+    ) as proc:
+        for line in proc.stderr:
+            tail.append(line)
+            logger.debug(f"git: {line.rstrip()}")
+    
+    if proc.returncode:
+        raise ValueError(f"Failed to clone repository: {''.join(tail)}")
+
+
+def _rate_limit_wait(status: int, headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Get how long to wait before retrying a rate-limited request.
+
+    Args:
+        status: HTTP status of the response.
+        headers: Headers of the response.
+
+    Returns:
+        Seconds to wait, or None if the response is not rate limited.
+    """
+    if status not in (403, 429):
+        return None
+    
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    
+    reset = headers.get("X-RateLimit-Reset")
+    if headers.get("X-RateLimit-Remaining") == "0" and reset:
+        return max(0.0, int(reset) - time.time())
+    
+    return None
+
+
+def _http_session(headers: Mapping[str, str]) -> Any:
+    """
+    Create the HTTP session used for GitHub API calls.
+
+    httpx with HTTP/2 is used when installed (``pip install spawn[http2]``),
+    so concurrent requests share one multiplexed connection; otherwise a
+    requests session with a connection pool is used. Both expose the same
+    ``request`` method and response interface, follow redirects (GitHub
+    redirects renamed and transferred repositories) and retry failed
+    connections. ``GitHubClient._request`` applies ``_REQUEST_TIMEOUT`` to
+    every request, since requests has no session-wide timeout, and retries
+    server errors.
+
+    Args:
+        headers: Default headers for every request.
+
+    Returns:
+        ``httpx.Client`` or ``requests.Session``.
+    """
+    try:
+        import h2  # noqa: F401
+        import httpx
+    except ImportError:
+        logger.debug("httpx[http2] not installed, using requests")
+    else:
+        transport = httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+        return httpx.Client(
+            headers=dict(headers),
+            timeout=_REQUEST_TIMEOUT,
+            follow_redirects=True,
+            transport=transport,
+        )
+    
+    # Imported here, not at module level, so CLI commands that never talk to
+    # GitHub do not pay for loading requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.headers.update(headers)
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=3),
+    )
+    return session
+
 
 class GitHubClient:
     """Client for interacting with GitHub API."""
 
+    # Seconds a cached contents ETag is trusted for conditional requests
+    ETAG_CACHE_TTL = 120.0
+    
+    # Rate-limited requests, and idempotent requests that hit a transient
+    # server error, are retried this many times; rate limits are waited out
+    # for at most RATE_LIMIT_MAX_WAIT seconds each time
+    REQUEST_RETRIES = 3
+    RATE_LIMIT_MAX_WAIT = 900.0
+    SERVER_ERROR_STATUSES = (502, 503, 504)
+    SERVER_ERROR_BACKOFF = 0.5
+
     def __init__(
         self,
         token: Optional[str] = None,
         username: Optional[str] = None,
         api_url: str = "https://api.github.com",
+        tokens: Optional[List[str]] = None,
     ):
         """
         Initialize the GitHub client.
@@ -35,8 +312,13 @@ class GitHubClient:
             token: GitHub personal access token. If None, uses the token from config or environment.
             username: GitHub username. If None, uses the username from config or environment.
             api_url: GitHub API URL.
+            tokens: Pool of personal access tokens to rotate read-only API requests
+                across. If None and no ``token`` is given, uses the tokens from config.
+                Requests that create or modify repositories always use ``token``.
         """
-        self.token = token or config.get("github", {}).get("token") or os.environ.get("GITHUB_TOKEN")
+        # An explicit token overrides the configured pool
+        tokens = tokens or ([] if token else config.get("github", {}).get("tokens")) or []
+        self.token = token or (tokens[0] if tokens else None) or config.get("github", {}).get("token") or os.environ.get("GITHUB_TOKEN")
         self.username = username or config.get("github", {}).get("username") or os.environ.get("GITHUB_USERNAME")
         self.api_url = api_url
         
@@ -45,22 +327,165 @@ class GitHubClient:
         
         if not self.username:
             logger.warning("No GitHub username provided. Some operations may fail.")
+        
+        # Token pool, rotated per read-only request; quota is tracked per
+        # (token, rate limit resource), and exhausted tokens are skipped until
+        # their reset time
+        pool = ([self.token] if self.token else []) + list(tokens)
+        self._tokens = deque(dict.fromkeys(pool))
+        self._token_remaining: Dict[Tuple[str, str], int] = {}
+        self._token_reset: Dict[Tuple[str, str], float] = {}
+        
+        # (owner, repo, branch, path) -> (etag, sha, monotonic timestamp); the
+        # ETag is None when the SHA comes from our own push
+        self._etag_cache: Dict[Tuple[str, str, str, str], Tuple[Optional[str], str, float]] = {}
+        
+        self._headers = {
+            "Accept": "application/vnd.github.v3+json",
+        }
+        
+        if self.token:
+            self._headers["Authorization"] = f"token {self.token}"
+        
+        # Share one session (and its connection pool) across all API calls
+        self._session = _http_session(self._get_headers())
     
-    def _get_headers(self) -> Dict[str, str]:
+    def _get_headers(self) -> Mapping[str, str]:
         """
         Get headers for GitHub API requests.
 
         Returns:
-            Dictionary of headers.
+            Read-only view of the headers built once at initialization.
         """
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-        }
+        return MappingProxyType(self._headers)
+    
+    def _rate_limit_wait(self, response: Any) -> Optional[float]:
+        """
+        Get how long to wait before retrying a rate-limited request.
+
+        Args:
+            response: Response to a GitHub API request.
+
+        Returns:
+            Seconds to wait, or None if the response is not rate limited.
+        """
+        return _rate_limit_wait(response.status_code, response.headers)
+    
+    def _token_available(self, token: str, resource: str, now: float) -> bool:
+        """
+        Check whether a token has quota left.
+
+        Args:
+            token: Token to check.
+            resource: Rate limit resource to check, e.g. ``core`` or ``graphql``.
+            now: Current time as a Unix timestamp.
+
+        Returns:
+            True unless the token's quota is exhausted and has not yet reset.
+        """
+        key = (token, resource)
+        return self._token_remaining.get(key, 1) > 0 or self._token_reset.get(key, 0.0) <= now
+    
+    def _next_token(self, resource: str) -> Optional[str]:
+        """
+        Select the token for the next request.
+
+        Args:
+            resource: Rate limit resource the request counts against.
+
+        Returns:
+            The next token in the pool that has quota left, the token that resets
+            soonest if all are exhausted, or None if there are no tokens.
+        """
+        if not self._tokens:
+            return None
         
-        if self.token:
-            headers["Authorization"] = f"token {self.token}"
+        now = time.time()
+        for _ in range(len(self._tokens)):
+            token = self._tokens[0]
+            self._tokens.rotate(-1)
+            if self._token_available(token, resource, now):
+                return token
         
-        return headers
+        return min(self._tokens, key=lambda t: self._token_reset.get((t, resource), 0.0))
+    
+    def _record_rate_limit(self, token: str, resource: str, response: Any) -> None:
+        """
+        Record a token's remaining quota from a response.
+
+        Args:
+            token: Token the request was sent with.
+            resource: Rate limit resource the request was expected to count against.
+            response: Response to the request.
+        """
+        # GitHub keeps separate quotas per resource and names the one used
+        key = (token, response.headers.get("X-RateLimit-Resource", resource))
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        
+        if remaining is not None:
+            self._token_remaining[key] = int(remaining)
+        
+        if reset is not None:
+            self._token_reset[key] = float(reset)
+    
+    def _request(self, method: str, url: str, rotate: bool = False, **kwargs: Any) -> Any:
+        """
+        Send a GitHub API request, waiting out rate limits and server errors.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            rotate: Whether the request may use any token in the pool. Only set for
+                read-only requests; the account a write is made with matters, so
+                writes always use ``self.token``.
+            **kwargs: Additional arguments for the session's ``request`` method.
+
+        Returns:
+            Response to the request.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        kwargs.setdefault("timeout", _REQUEST_TIMEOUT)
+        resource = "graphql" if url.endswith("/graphql") else "core"
+        
+        # POSTs are only retried on server errors when read-only
+        idempotent = rotate or method in ("GET", "HEAD", "PUT", "DELETE")
+        
+        for attempt in range(self.REQUEST_RETRIES + 1):
+            token = self._next_token(resource) if rotate else self.token
+            if token:
+                headers["Authorization"] = f"token {token}"
+            
+            response = self._session.request(method, url, headers=headers, **kwargs)
+            
+            if token:
+                self._record_rate_limit(token, resource, response)
+            
+            if attempt == self.REQUEST_RETRIES:
+                return response
+            
+            if idempotent and response.status_code in self.SERVER_ERROR_STATUSES:
+                time.sleep(self.SERVER_ERROR_BACKOFF * 2 ** attempt)
+                continue
+            
+            wait = self._rate_limit_wait(response)
+            if wait is None:
+                return response
+            
+            # Another token in the pool may still have quota left
+            now = time.time()
+            if rotate and token and not self._token_available(token, resource, now) and any(
+                self._token_available(t, resource, now) for t in self._tokens
+            ):
+                continue
+            
+            if wait > self.RATE_LIMIT_MAX_WAIT:
+                return response
+            
+            logger.warning(f"GitHub rate limit reached, retrying in {wait:.0f}s")
+            time.sleep(wait)
+        
+        return response
     
     def create_fork(
         self,
@@ -90,13 +515,21 @@ class GitHubClient:
             raise ValueError("GitHub token is required to create a fork")
         
         # Create fork
-        fork_url = f"{self.api_url}/repos/{repo_owner}/{repo_name}/forks"
+        fork_url = _endpoint(self.api_url, _FORKS, repo_owner, repo_name)
         fork_data = {}
         
         if organization:
             fork_data["organization"] = organization
         
-        response = requests.post(fork_url, headers=self._get_headers(), json=fork_data)
+        if new_name and new_name != repo_name:
+            fork_data["name"] = new_name
+        
+        response = self._request("POST", fork_url, json=fork_data)
+        
+        # Fall back to fork-then-rename where the API rejects the name field
+        if response.status_code == 422 and "name" in fork_data:
+            del fork_data["name"]
+            response = self._request("POST", fork_url, json=fork_data)
         
         if response.status_code != 202:
             raise ValueError(f"Failed to create fork: {response.json().get('message', response.text)}")
@@ -104,22 +537,27 @@ class GitHubClient:
         fork_info = response.json()
         logger.info(f"Created fork: {fork_info['full_name']}")
         
-        # Rename repository if needed
-        if new_name and new_name != repo_name:
-            owner = organization or self.username
-            rename_url = f"{self.api_url}/repos/{owner}/{repo_name}"
-            rename_data = {"name": new_name}
-            
-            if description:
-                rename_data["description"] = description
+        # The forks endpoint ignores the description, so set it (and the name,
+        # if the fallback was used) with a single update
+        update_data = {}
+        
+        if new_name and fork_info["name"] != new_name:
+            update_data["name"] = new_name
+        
+        if description:
+            update_data["description"] = description
+        
+        if update_data:
+            owner = fork_info["owner"]["login"]
+            update_url = _endpoint(self.api_url, _REPO, owner, fork_info["name"])
             
-            response = requests.patch(rename_url, headers=self._get_headers(), json=rename_data)
+            response = self._request("PATCH", update_url, json=update_data)
             
             if response.status_code != 200:
-                logger.warning(f"Failed to rename repository: {response.json().get('message', response.text)}")
+                logger.warning(f"Failed to update repository: {response.json().get('message', response.text)}")
             else:
                 fork_info = response.json()
-                logger.info(f"Renamed repository to: {fork_info['full_name']}")
+                logger.info(f"Updated repository: {fork_info['full_name']}")
         
         return fork_info
     
@@ -142,40 +580,100 @@ class GitHubClient:
         if not self.token:
             raise ValueError("GitHub token is required to configure repo")
 
-        headers = self._get_headers()
-
         # Enable Actions with write access
-        actions_url = f"{self.api_url}/repos/{repo_owner}/{repo_name}/actions/permissions"
+        actions_url = _endpoint(self.api_url, _ACTIONS, repo_owner, repo_name)
         actions_payload = {
             "enabled": True,
             "allowed_actions": "all",
             "default_workflow_permissions": "write",
         }
-        r1 = requests.put(actions_url, headers=headers, json=actions_payload)
-        if r1.status_code not in [200, 204]:
-            logger.warning(f"Failed to update Actions permissions: {r1.text}")
 
         # Enable GitHub Pages from branch
-        pages_url = f"{self.api_url}/repos/{repo_owner}/{repo_name}/pages"
+        pages_url = _endpoint(self.api_url, _PAGES, repo_owner, repo_name)
         pages_payload = {
             "source": {
                 "branch": branch,
                 "path": pages_path,
             }
         }
-        r2 = requests.put(pages_url, headers=headers, json=pages_payload)
+
+        # The two settings are independent, so send both requests at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            f1 = executor.submit(self._request, "PUT", actions_url, json=actions_payload)
+            f2 = executor.submit(self._request, "PUT", pages_url, json=pages_payload)
+            r1, r2 = f1.result(), f2.result()
+
+        if r1.status_code not in [200, 204]:
+            logger.warning(f"Failed to update Actions permissions: {r1.text}")
         if r2.status_code not in [201, 204]:
             logger.warning(f"Failed to enable GitHub Pages: {r2.text}")
         else:
             logger.info(f"Enabled GitHub Pages for {repo_owner}/{repo_name} from branch {branch}")
 
 
+    def batch_status(self, repos: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """
+        Get the provisioning status of several repositories in one request.
+
+        A single GraphQL query with one aliased ``repository`` field per
+        repository replaces a REST call per repository.
+
+        Args:
+            repos: List of (owner, name) pairs.
+
+        Returns:
+            Dictionary mapping each (owner, name) pair to its status (``nameWithOwner``,
+            ``isEmpty``, ``isFork``, ``pushedAt`` and ``defaultBranchRef``), or None if
+            the repository does not exist or is not accessible.
+
+        Raises:
+            ValueError: If the query fails.
+        """
+        if not repos:
+            return {}
+        
+        declarations = []
+        fields = []
+        variables = {}
+        
+        for i, (owner, name) in enumerate(repos):
+            declarations.append(f"$o{i}: String!, $n{i}: String!")
+            fields.append(
+                f"r{i}: repository(owner: $o{i}, name: $n{i}) "
+                "{ nameWithOwner isEmpty isFork pushedAt defaultBranchRef { name } }"
+            )
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = name
+        
+        query = f"query({', '.join(declarations)}) {{ {' '.join(fields)} }}"
+        
+        response = self._request(
+            "POST",
+            f"{self.api_url}/graphql",
+            rotate=True,
+            json={"query": query, "variables": variables},
+        )
+        
+        if response.status_code != 200:
+            raise ValueError(f"Failed to query repository status: {response.text}")
+        
+        # Missing repositories come back as null with a NOT_FOUND error, so
+        # only fail when no data was returned at all
+        body = response.json()
+        data = body.get("data")
+        
+        if data is None:
+            raise ValueError(f"Failed to query repository status: {body.get('errors')}")
+        
+        return {repo: data.get(f"r{i}") for i, repo in enumerate(repos)}
+    
     def clone_repository(
         self,
         repo_owner: str,
         repo_name: str,
         target_dir: Optional[Path] = None,
         branch: str = "main",
+        depth: Optional[int] = 1,
     ) -> Path:
         """
         Clone a GitHub repository.
@@ -185,6 +683,7 @@ class GitHubClient:
             repo_name: Name of the repository to clone.
             target_dir: Directory to clone the repository into. If None, creates a temporary directory.
             branch: Branch to clone.
+            depth: Number of commits of history to fetch. If None, clones the full history.
 
         Returns:
             Path to the cloned repository.
@@ -194,29 +693,18 @@ class GitHubClient:
         """
         # Determine target directory
         if target_dir is None:
+            import tempfile
             target_dir = Path(tempfile.mkdtemp())
         else:
             target_dir = Path(target_dir).expanduser().absolute()
             target_dir.mkdir(parents=True, exist_ok=True)
         
-        # Clone repository
+        # Clone repository; the token is sent as a header, never put in the URL
         repo_url = f"https://github.com/{repo_owner}/{repo_name}.git"
         
-        if self.token:
-            # Use token for authentication
-            repo_url = f"https://{self.token}@github.com/{repo_owner}/{repo_name}.git"
-        
-        try:
-            subprocess.run(
-                ["git", "clone", "--branch", branch, repo_url, str(target_dir)],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            logger.info(f"Cloned repository {repo_owner}/{repo_name} to {target_dir}")
-            return target_dir
-        except subprocess.CalledProcessError as e:
-            raise ValueError(f"Failed to clone repository: {e.stderr}")
+        _run_clone(_clone_command(repo_url, target_dir, branch, depth), _git_env(self.token))
+        logger.info(f"Cloned repository {repo_owner}/{repo_name} to {target_dir}")
+        return target_dir
     
     def push_file(
         self,
@@ -226,6 +714,7 @@ class GitHubClient:
         content: Union[str, Dict[str, Any], bytes],
         message: str,
         branch: str = "main",
+        content_is_base64: bool = False,
     ) -> Dict[str, Any]:
         """
         Push a file to a GitHub repository.
@@ -237,9 +726,12 @@ class GitHubClient:
             content: Content of the file. Can be a string, dictionary, or bytes.
             message: Commit message.
             branch: Branch to push to.
+            content_is_base64: Whether content is already base64-encoded, e.g. to
+                push the same file to several repositories without re-encoding it.
 
         Returns:
-            Dictionary with information about the commit.
+            Dictionary with information about the commit. If the file already has
+            this content nothing is pushed and ``commit`` is None.
 
         Raises:
             ValueError: If the push fails.
@@ -248,45 +740,203 @@ class GitHubClient:
             raise ValueError("GitHub token is required to push files")
         
         # Get the current file to get its SHA
-        url = f"{self.api_url}/repos/{repo_owner}/{repo_name}/contents/{file_path}"
+        url = _endpoint(self.api_url, _CONTENTS, repo_owner, repo_name, file_path)
         params = {"ref": branch}
         
-        response = requests.get(url, headers=self._get_headers(), params=params)
-        
-        # Prepare content
-        if isinstance(content, dict):
-            content = json.dumps(content, indent=2)
-        
-        if isinstance(content, str):
-            import base64
-            content = base64.b64encode(content.encode("utf-8")).decode("utf-8")
-        elif isinstance(content, bytes):
-            import base64
-            content = base64.b64encode(content).decode("utf-8")
+        # A recent cache entry either carries an ETag to revalidate (an
+        # unchanged file answers 304, which does not count against the rate
+        # limit) or, right after our own push, the SHA itself so the GET can
+        # be skipped entirely
+        cache_key = (repo_owner, repo_name, branch, file_path)
+        cached = self._etag_cache.get(cache_key)
+        if cached and time.monotonic() - cached[2] > self.ETAG_CACHE_TTL:
+            cached = None
         
         # Prepare request data
+        raw = base64.b64decode(content) if content_is_base64 else _content_bytes(content)
         data = {
             "message": message,
-            "content": content,
+            "content": content if content_is_base64 else base64.b64encode(raw).decode("ascii"),
             "branch": branch,
         }
         
-        # If file exists, add its SHA
-        if response.status_code == 200:
-            data["sha"] = response.json()["sha"]
+        blob_sha = _git_blob_sha(raw)
+        
+        # A SHA from our own push is unconfirmed: good enough as the base of a
+        # new commit (a stale one fails with 409), but not as proof that the
+        # file already holds this content
+        if cached and cached[0] is None and cached[1] != blob_sha:
+            data["sha"] = cached[1]
+        else:
+            etag = cached[0] if cached else None
+            headers = {"If-None-Match": etag} if etag else {}
+            # The parent directory listing has the SHA without the file's
+            # content, which would otherwise be downloaded in full
+            dir_url = _endpoint(
+                self.api_url, _CONTENTS, repo_owner, repo_name,
+                posixpath.dirname(file_path.strip("/")),
+            ).rstrip("/")
+            response = self._request("GET", dir_url, params=params, headers=headers)
+            
+            # If file exists, add its SHA; a missing directory needs no parsing
+            if response.status_code == 304 and etag:
+                data["sha"] = cached[1]
+            elif response.status_code == 200:
+                sha = _listing_sha(response.json(), file_path)
+                if sha:
+                    data["sha"] = sha
+                etag = response.headers.get("ETag")
+                if sha and etag:
+                    self._etag_cache[cache_key] = (etag, data["sha"], time.monotonic())
+            elif response.status_code != 404:
+                raise ValueError(f"Failed to get file {file_path}: {response.text}")
+        
+        # Pushing identical content would only create an empty commit
+        if data.get("sha") == blob_sha:
+            logger.info(f"File {file_path} in {repo_owner}/{repo_name} is unchanged; skipping push")
+            return {"content": {"path": file_path, "sha": data["sha"]}, "commit": None}
         
         # Push file
-        response = requests.put(url, headers=self._get_headers(), json=data)
+        response = self._request("PUT", url, json=data)
+        
+        # The file changed since our last push; look the SHA up again
+        if response.status_code == 409 and cached and cached[0] is None:
+            self._etag_cache.pop(cache_key, None)
+            return self.push_file(
+                repo_owner=repo_owner,
+                repo_name=repo_name,
+                file_path=file_path,
+                content=data["content"],
+                message=message,
+                branch=branch,
+                content_is_base64=True,
+            )
         
         if response.status_code not in [200, 201]:
             raise ValueError(f"Failed to push file: {response.json().get('message', response.text)}")
         
         result = response.json()
+        
+        # Remember the new SHA so an immediate re-push needs no lookup
+        self._etag_cache[cache_key] = (None, result["content"]["sha"], time.monotonic())
+        
         logger.info(f"Pushed file {file_path} to {repo_owner}/{repo_name}")
         
         return result
 
 
+class _HashingWriter:
+    """File wrapper that hashes text as it is written."""
+
+    def __init__(self, f: Any, digest: Any):
+        """
+        Initialize the writer.
+
+        Args:
+            f: Text file to write to.
+            digest: hashlib object to update with the UTF-8 encoded text.
+        """
+        self.f = f
+        self.digest = digest
+    
+    def write(self, s: str) -> int:
+        """
+        Write text to the file and add it to the digest.
+
+        Args:
+            s: Text to write.
+
+        Returns:
+            Number of characters written.
+        """
+        self.digest.update(s.encode("utf-8"))
+        return self.f.write(s)
+
+
+def _file_digest(path: Path, chunk_size: int = 1 << 16) -> bytes:
+    """
+    Hash a file in chunks with the same digest used for written configs.
+
+    Args:
+        path: Path to the file.
+        chunk_size: Number of bytes to read at a time.
+
+    Returns:
+        BLAKE2b digest of the file.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    
+    return digest.digest()
+
+
+def _configured_credentials() -> Tuple[Optional[str], Optional[str], Tuple[str, ...]]:
+    """
+    Get the GitHub credentials currently set in config or environment.
+
+    Returns:
+        Tuple of (token, username, token pool), resolved as ``GitHubClient`` does.
+    """
+    github_config = config.get("github", {})
+    tokens = tuple(github_config.get("tokens") or ())
+    token = (tokens[0] if tokens else None) or github_config.get("token") or os.environ.get("GITHUB_TOKEN")
+    username = github_config.get("username") or os.environ.get("GITHUB_USERNAME")
+    
+    return token, username, tokens
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_client(
+    token: Optional[str],
+    username: Optional[str],
+    tokens: Tuple[str, ...],
+) -> GitHubClient:
+    """
+    Get the shared GitHub client for the configured credentials.
+
+    The credentials are the cache key, so changing the config or environment
+    yields a new client instead of the one built at the first call.
+
+    Args:
+        token: Configured GitHub personal access token.
+        username: Configured GitHub username.
+        tokens: Configured token pool.
+
+    Returns:
+        GitHub client for these credentials.
+    """
+    return GitHubClient(token=token, username=username, tokens=list(tokens) or None)
+
+
+def _default_client(
+    token: Optional[str] = None,
+    username: Optional[str] = None,
+) -> GitHubClient:
+    """
+    Get a GitHub client for the module-level helpers.
+
+    When the configured credentials are used, the client is shared across
+    calls, which keeps its connection pool, ETag cache, and token rate-limit
+    state alive in batch scripts. Explicit credentials get a one-shot client.
+
+    Args:
+        token: GitHub personal access token. If None, uses the token from config or environment.
+        username: GitHub username. If None, uses the username from config or environment.
+
+    Returns:
+        GitHub client for these credentials.
+    """
+    configured_token, configured_username, tokens = _configured_credentials()
+    
+    if token in (None, configured_token) and username in (None, configured_username):
+        return _shared_client(configured_token, configured_username, tokens)
+    
+    return GitHubClient(token=token, username=username)
+
+
 def fork_template_portal(
     new_name: str,
     description: Optional[str] = None,
@@ -309,8 +959,8 @@ def fork_template_portal(
     Returns:
         Dictionary with information about the forked repository and the path to the cloned repository.
     """
-    # Create GitHub client
-    client = GitHubClient(token=token, username=username)
+    # Get GitHub client
+    client = _default_client(token, username)
     
     # Fork repository
     fork_info = client.create_fork(
@@ -396,30 +1046,52 @@ def configure_static_json(
     if additional_config:
         config_data.update(additional_config)
     
-    # Write configuration to static.json
-    with open(static_json_path, "w") as f:
-        json.dump(config_data, f, indent=2)
+    # Write configuration to static.json. The payload is only kept in memory
+    # when it has to be pushed; otherwise it is streamed to disk. An unchanged
+    # file is left alone, a changed one is replaced atomically.
+    tmp_path = static_json_path.with_suffix(".json.tmp")
+    digest = hashlib.blake2b(digest_size=16)
     
-    logger.info(f"Configured static.json at {static_json_path}")
+    # The temporary file must never be left in the portal checkout, where a
+    # later commit could pick it up
+    try:
+        if push_to_github:
+            payload = json.dumps(config_data, indent=2).encode("utf-8")
+            digest.update(payload)
+        else:
+            payload = None
+            # No newline translation, so the file matches what was hashed and
+            # what the push branch writes on every platform
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                json.dump(config_data, _HashingWriter(f, digest), indent=2)
+        
+        if static_json_path.exists() and _file_digest(static_json_path) == digest.digest():
+            if payload is None:
+                tmp_path.unlink()
+            logger.info(f"static.json at {static_json_path} is unchanged")
+        else:
+            if payload is not None:
+                tmp_path.write_bytes(payload)
+            os.replace(tmp_path, static_json_path)
+            logger.info(f"Configured static.json at {static_json_path}")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
     
     # Push changes to GitHub if requested
     if push_to_github:
         if not repo_owner or not repo_name:
             raise ValueError("repo_owner and repo_name are required when push_to_github is True")
         
-        # Create GitHub client
-        client = GitHubClient(token=token, username=username)
-        
-        # Read the file content
-        with open(static_json_path, "r") as f:
-            content = f.read()
+        # Get GitHub client
+        client = _default_client(token, username)
         
         # Push the file
         client.push_file(
             repo_owner=repo_owner,
             repo_name=repo_name,
             file_path="static.json",
-            content=content,
+            content=payload,
             message=commit_message,
             branch=branch,
         )
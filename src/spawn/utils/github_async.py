@@ -0,0 +1,577 @@
+"""
+Asynchronous GitHub repository operations for SPAwn.
+
+This module mirrors :mod:`spawn.utils.github` using aiohttp, so that many
+portals can be forked and configured concurrently with ``asyncio.gather``.
+"""
+
+import asyncio
+import base64
+import functools
+import json
+import logging
+import os
+import posixpath
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import aiohttp
+
+from spawn.config import config
+from spawn.utils.github import _ACTIONS
+from spawn.utils.github import _CONTENTS
+from spawn.utils.github import _FORKS
+from spawn.utils.github import _PAGES
+from spawn.utils.github import _REPO
+from spawn.utils.github import GitHubClient
+from spawn.utils.github import _clone_command
+from spawn.utils.github import _content_bytes
+from spawn.utils.github import _endpoint
+from spawn.utils.github import _git_blob_sha
+from spawn.utils.github import _git_env
+from spawn.utils.github import _listing_sha
+from spawn.utils.github import _rate_limit_wait
+from spawn.utils.github import _run_clone
+
+logger = logging.getLogger(__name__)
+
+
+class _BufferedResponse:
+    """Fully read aiohttp response, with the interface of a requests response."""
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes):
+        """
+        Initialize the response.
+
+        Args:
+            status_code: HTTP status of the response.
+            headers: Headers of the response.
+            content: Body of the response.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        """Get the body as text."""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """Get the body parsed as JSON."""
+        return json.loads(self.content)
+
+
+class AsyncGitHubClient:
+    """Asynchronous client for interacting with GitHub API."""
+
+    # Same caching and retry policy as the synchronous client
+    ETAG_CACHE_TTL = GitHubClient.ETAG_CACHE_TTL
+    REQUEST_RETRIES = GitHubClient.REQUEST_RETRIES
+    RATE_LIMIT_MAX_WAIT = GitHubClient.RATE_LIMIT_MAX_WAIT
+    SERVER_ERROR_STATUSES = GitHubClient.SERVER_ERROR_STATUSES
+    SERVER_ERROR_BACKOFF = GitHubClient.SERVER_ERROR_BACKOFF
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        username: Optional[str] = None,
+        api_url: str = "https://api.github.com",
+        connection_limit: int = 20,
+    ):
+        """
+        Initialize the asynchronous GitHub client.
+
+        The client must be used as an async context manager, which owns the
+        underlying ``aiohttp.ClientSession``.
+
+        Args:
+            token: GitHub personal access token. If None, uses the token from config or environment.
+            username: GitHub username. If None, uses the username from config or environment.
+            api_url: GitHub API URL.
+            connection_limit: Maximum number of simultaneous connections.
+        """
+        self.token = token or config.get("github", {}).get("token") or os.environ.get("GITHUB_TOKEN")
+        self.username = username or config.get("github", {}).get("username") or os.environ.get("GITHUB_USERNAME")
+        self.api_url = api_url
+        self.connection_limit = connection_limit
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # (owner, repo, branch, path) -> (etag, sha, monotonic timestamp); the
+        # ETag is None when the SHA comes from our own push
+        self._etag_cache: Dict[Tuple[str, str, str, str], Tuple[Optional[str], str, float]] = {}
+
+        if not self.token:
+            logger.warning("No GitHub token provided. Some operations may fail.")
+
+        if not self.username:
+            logger.warning("No GitHub username provided. Some operations may fail.")
+
+        self._headers = {
+            "Accept": "application/vnd.github.v3+json",
+        }
+
+        if self.token:
+            self._headers["Authorization"] = f"token {self.token}"
+
+    async def __aenter__(self) -> "AsyncGitHubClient":
+        """Open the underlying HTTP session."""
+        self._session = aiohttp.ClientSession(
+            headers=self._headers,
+            connector=aiohttp.TCPConnector(limit=self.connection_limit),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Get the open HTTP session.
+
+        Raises:
+            RuntimeError: If the client is not used as an async context manager.
+        """
+        if self._session is None:
+            raise RuntimeError("AsyncGitHubClient must be used with 'async with'")
+        return self._session
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> _BufferedResponse:
+        """
+        Send a GitHub API request, waiting out rate limits and server errors.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            **kwargs: Additional arguments for ``aiohttp.ClientSession.request``.
+
+        Returns:
+            Fully read response to the request.
+        """
+        # POSTs are not retried on server errors
+        idempotent = method in ("GET", "HEAD", "PUT", "DELETE")
+
+        for attempt in range(self.REQUEST_RETRIES + 1):
+            async with self.session.request(method, url, **kwargs) as r:
+                response = _BufferedResponse(r.status, r.headers, await r.read())
+
+            if attempt == self.REQUEST_RETRIES:
+                return response
+
+            if idempotent and response.status_code in self.SERVER_ERROR_STATUSES:
+                await asyncio.sleep(self.SERVER_ERROR_BACKOFF * 2 ** attempt)
+                continue
+
+            wait = _rate_limit_wait(response.status_code, response.headers)
+            if wait is None or wait > self.RATE_LIMIT_MAX_WAIT:
+                return response
+
+            logger.warning(f"GitHub rate limit reached, retrying in {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+        return response
+
+    async def create_fork(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        new_name: Optional[str] = None,
+        organization: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a fork of a GitHub repository.
+
+        Args:
+            repo_owner: Owner of the repository to fork.
+            repo_name: Name of the repository to fork.
+            new_name: New name for the forked repository. If None, uses the original name.
+            organization: Organization to create the fork in. If None, creates in the user's account.
+            description: Description for the new repository.
+
+        Returns:
+            Dictionary with information about the forked repository.
+
+        Raises:
+            ValueError: If the fork creation fails.
+        """
+        if not self.token:
+            raise ValueError("GitHub token is required to create a fork")
+
+        # Create fork
+        fork_url = _endpoint(self.api_url, _FORKS, repo_owner, repo_name)
+        fork_data = {}
+
+        if organization:
+            fork_data["organization"] = organization
+
+        if new_name and new_name != repo_name:
+            fork_data["name"] = new_name
+
+        response = await self._request("POST", fork_url, json=fork_data)
+
+        # Fall back to fork-then-rename where the API rejects the name field
+        if response.status_code == 422 and "name" in fork_data:
+            del fork_data["name"]
+            response = await self._request("POST", fork_url, json=fork_data)
+
+        if response.status_code != 202:
+            raise ValueError(f"Failed to create fork: {response.json().get('message', response.text)}")
+
+        fork_info = response.json()
+        logger.info(f"Created fork: {fork_info['full_name']}")
+
+        # The forks endpoint ignores the description, so set it (and the name,
+        # if the fallback was used) with a single update
+        update_data = {}
+
+        if new_name and fork_info["name"] != new_name:
+            update_data["name"] = new_name
+
+        if description:
+            update_data["description"] = description
+
+        if update_data:
+            owner = fork_info["owner"]["login"]
+            update_url = _endpoint(self.api_url, _REPO, owner, fork_info["name"])
+
+            response = await self._request("PATCH", update_url, json=update_data)
+
+            if response.status_code != 200:
+                logger.warning(f"Failed to update repository: {response.json().get('message', response.text)}")
+            else:
+                fork_info = response.json()
+                logger.info(f"Updated repository: {fork_info['full_name']}")
+
+        return fork_info
+
+    async def configure_pages_and_actions(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        branch: str = "gh-pages",
+        pages_path: str = "/",
+    ) -> None:
+        """
+        Configure GitHub Actions permissions and enable GitHub Pages deployment.
+
+        Args:
+            repo_owner: Owner of the repository.
+            repo_name: Name of the repository.
+            branch: Branch to deploy from (e.g., 'gh-pages').
+            pages_path: Path in the repo to deploy (default is root).
+        """
+        if not self.token:
+            raise ValueError("GitHub token is required to configure repo")
+
+        # Enable Actions with write access
+        actions_url = _endpoint(self.api_url, _ACTIONS, repo_owner, repo_name)
+        actions_payload = {
+            "enabled": True,
+            "allowed_actions": "all",
+            "default_workflow_permissions": "write",
+        }
+
+        # Enable GitHub Pages from branch
+        pages_url = _endpoint(self.api_url, _PAGES, repo_owner, repo_name)
+        pages_payload = {
+            "source": {
+                "branch": branch,
+                "path": pages_path,
+            }
+        }
+
+        # The two settings are independent, so send both requests at once
+        r1, r2 = await asyncio.gather(
+            self._request("PUT", actions_url, json=actions_payload),
+            self._request("PUT", pages_url, json=pages_payload),
+        )
+
+        if r1.status_code not in [200, 204]:
+            logger.warning(f"Failed to update Actions permissions: {r1.text}")
+        if r2.status_code not in [201, 204]:
+            logger.warning(f"Failed to enable GitHub Pages: {r2.text}")
+        else:
+            logger.info(f"Enabled GitHub Pages for {repo_owner}/{repo_name} from branch {branch}")
+
+    async def clone_repository(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        target_dir: Optional[Path] = None,
+        branch: str = "main",
+        depth: Optional[int] = 1,
+    ) -> Path:
+        """
+        Clone a GitHub repository.
+
+        git itself is blocking, so the clone runs in a worker thread.
+
+        Args:
+            repo_owner: Owner of the repository to clone.
+            repo_name: Name of the repository to clone.
+            target_dir: Directory to clone the repository into. If None, creates a temporary directory.
+            branch: Branch to clone.
+            depth: Number of commits of history to fetch. If None, clones the full history.
+
+        Returns:
+            Path to the cloned repository.
+
+        Raises:
+            ValueError: If the clone fails.
+        """
+        # Determine target directory
+        if target_dir is None:
+            target_dir = Path(tempfile.mkdtemp())
+        else:
+            target_dir = Path(target_dir).expanduser().absolute()
+            target_dir.mkdir(parents=True, exist_ok=True)
+
+        # Clone repository; the token is sent as a header, never put in the URL
+        repo_url = f"https://github.com/{repo_owner}/{repo_name}.git"
+
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                _run_clone,
+                _clone_command(repo_url, target_dir, branch, depth),
+                _git_env(self.token),
+            ),
+        )
+        logger.info(f"Cloned repository {repo_owner}/{repo_name} to {target_dir}")
+        return target_dir
+
+    async def push_file(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        file_path: str,
+        content: Union[str, Dict[str, Any], bytes],
+        message: str,
+        branch: str = "main",
+        content_is_base64: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Push a file to a GitHub repository.
+
+        Args:
+            repo_owner: Owner of the repository.
+            repo_name: Name of the repository.
+            file_path: Path to the file in the repository.
+            content: Content of the file. Can be a string, dictionary, or bytes.
+            message: Commit message.
+            branch: Branch to push to.
+            content_is_base64: Whether content is already base64-encoded, e.g. to
+                push the same file to several repositories without re-encoding it.
+
+        Returns:
+            Dictionary with information about the commit. If the file already has
+            this content nothing is pushed and ``commit`` is None.
+
+        Raises:
+            ValueError: If the push fails.
+        """
+        if not self.token:
+            raise ValueError("GitHub token is required to push files")
+
+        # Get the current file to get its SHA
+        url = _endpoint(self.api_url, _CONTENTS, repo_owner, repo_name, file_path)
+        params = {"ref": branch}
+
+        # A recent cache entry either carries an ETag to revalidate or, right
+        # after our own push, the SHA itself so the GET can be skipped
+        cache_key = (repo_owner, repo_name, branch, file_path)
+        cached = self._etag_cache.get(cache_key)
+        if cached and time.monotonic() - cached[2] > self.ETAG_CACHE_TTL:
+            cached = None
+
+        # Prepare request data
+        raw = base64.b64decode(content) if content_is_base64 else _content_bytes(content)
+        data = {
+            "message": message,
+            "content": content if content_is_base64 else base64.b64encode(raw).decode("ascii"),
+            "branch": branch,
+        }
+
+        blob_sha = _git_blob_sha(raw)
+
+        # A SHA from our own push is unconfirmed: good enough as the base of a
+        # new commit (a stale one fails with 409), but not as proof that the
+        # file already holds this content
+        if cached and cached[0] is None and cached[1] != blob_sha:
+            data["sha"] = cached[1]
+        else:
+            etag = cached[0] if cached else None
+            headers = {"If-None-Match": etag} if etag else {}
+            # The parent directory listing has the SHA without the file's
+            # content, which would otherwise be downloaded in full
+            dir_url = _endpoint(
+                self.api_url, _CONTENTS, repo_owner, repo_name,
+                posixpath.dirname(file_path.strip("/")),
+            ).rstrip("/")
+            response = await self._request("GET", dir_url, params=params, headers=headers)
+
+            # If file exists, add its SHA; a missing directory needs no parsing
+            if response.status_code == 304 and etag:
+                data["sha"] = cached[1]
+            elif response.status_code == 200:
+                sha = _listing_sha(response.json(), file_path)
+                if sha:
+                    data["sha"] = sha
+                etag = response.headers.get("ETag")
+                if sha and etag:
+                    self._etag_cache[cache_key] = (etag, data["sha"], time.monotonic())
+            elif response.status_code != 404:
+                raise ValueError(f"Failed to get file {file_path}: {response.text}")
+
+        # Pushing identical content would only create an empty commit
+        if data.get("sha") == blob_sha:
+            logger.info(f"File {file_path} in {repo_owner}/{repo_name} is unchanged; skipping push")
+            return {"content": {"path": file_path, "sha": data["sha"]}, "commit": None}
+
+        # Push file
+        response = await self._request("PUT", url, json=data)
+
+        # The file changed since our last push; look the SHA up again
+        if response.status_code == 409 and cached and cached[0] is None:
+            self._etag_cache.pop(cache_key, None)
+            return await self.push_file(
+                repo_owner=repo_owner,
+                repo_name=repo_name,
+                file_path=file_path,
+                content=data["content"],
+                message=message,
+                branch=branch,
+                content_is_base64=True,
+            )
+
+        if response.status_code not in [200, 201]:
+            raise ValueError(f"Failed to push file: {response.json().get('message', response.text)}")
+
+        result = response.json()
+
+        # Remember the new SHA so an immediate re-push needs no lookup
+        self._etag_cache[cache_key] = (None, result["content"]["sha"], time.monotonic())
+
+        logger.info(f"Pushed file {file_path} to {repo_owner}/{repo_name}")
+
+        return result
+
+
+async def fork_template_portal_async(
+    new_name: str,
+    description: Optional[str] = None,
+    organization: Optional[str] = None,
+    token: Optional[str] = None,
+    username: Optional[str] = None,
+    clone_dir: Optional[Path] = None,
+    client: Optional[AsyncGitHubClient] = None,
+) -> Dict[str, Any]:
+    """
+    Fork the Globus template search portal asynchronously.
+
+    Args:
+        new_name: Name for the forked repository.
+        description: Description for the new repository.
+        organization: Organization to create the fork in. If None, creates in the user's account.
+        token: GitHub personal access token. If None, uses the token from config or environment.
+        username: GitHub username. If None, uses the username from config or environment.
+        clone_dir: Directory to clone the repository into. If None, doesn't clone the repository.
+        client: Open client to reuse. If None, a client is created for this call.
+
+    Returns:
+        Dictionary with information about the forked repository and the path to the cloned repository.
+    """
+    if client is None:
+        async with AsyncGitHubClient(token=token, username=username) as own_client:
+            return await fork_template_portal_async(
+                new_name=new_name,
+                description=description,
+                organization=organization,
+                clone_dir=clone_dir,
+                client=own_client,
+            )
+
+    # Fork repository
+    fork_info = await client.create_fork(
+        repo_owner="globus",
+        repo_name="template-search-portal",
+        new_name=new_name,
+        organization=organization,
+        description=description,
+    )
+
+    result = {
+        "repository": fork_info,
+        "clone_path": None,
+    }
+
+    # Clone repository if requested
+    if clone_dir is not None:
+        owner = organization or client.username
+        clone_path = await client.clone_repository(
+            repo_owner=owner,
+            repo_name=new_name,
+            target_dir=clone_dir,
+        )
+        result["clone_path"] = str(clone_path)
+
+    return result
+
+
+def fork_template_portals(
+    new_names: List[str],
+    organization: Optional[str] = None,
+    token: Optional[str] = None,
+    username: Optional[str] = None,
+) -> List[Union[Dict[str, Any], BaseException]]:
+    """
+    Fork the Globus template search portal several times concurrently.
+
+    Synchronous entry point that drives :func:`fork_template_portal_async`
+    for every name over a single shared client. A failed fork does not stop
+    the others, so the forks that were created are always reported.
+
+    Args:
+        new_names: Names for the forked repositories.
+        organization: Organization to create the forks in. If None, creates in the user's account.
+        token: GitHub personal access token. If None, uses the token from config or environment.
+        username: GitHub username. If None, uses the username from config or environment.
+
+    Returns:
+        For each name in ``new_names``, in order, the fork result or the exception
+        that made the fork fail.
+    """
+    async def _run() -> List[Union[Dict[str, Any], BaseException]]:
+        async with AsyncGitHubClient(token=token, username=username) as client:
+            return await asyncio.gather(
+                *(
+                    fork_template_portal_async(
+                        new_name=name,
+                        organization=organization,
+                        client=client,
+                    )
+                    for name in new_names
+                ),
+                return_exceptions=True,
+            )
+
+    results = asyncio.run(_run())
+
+    for name, result in zip(new_names, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.error(f"Error forking portal {name}: {result}")
+
+    return results